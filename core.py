@@ -0,0 +1,863 @@
+"""
+Shared Twitter (via Nitter RSS) → Bluesky crossposting logic.
+The twitter_to_bluesky*.py scripts only pick the accounts to mirror and
+which features to enable, then call run().
+"""
+import asyncio
+import atexit
+import os
+import signal
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Iterator, List, Dict, NamedTuple
+
+import shutil
+import time
+import re
+
+import aiohttp
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+import lxml.html
+from lxml import etree
+from aiolimiter import AsyncLimiter
+from atproto import Client, models
+from atproto.exceptions import RateLimitExceededError, RequestErrorBase
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+# ========== CONFIGURATION ==========
+
+GIST_ID = os.environ.get("GIST_ID")
+GIST_TOKEN = os.environ.get("GIST_TOKEN")
+STATE_FILENAME = "posted_tweets.json"
+
+# Save state to the gist after every this many new posts, so a crash
+# mid-run can't lose (and later repost) more than this many tweets
+SAVE_EVERY_N_POSTS = 10
+
+# How many recent tweets per user to consider each run
+TWEETS_PER_USER = 10
+
+# How many posted tweet IDs to remember (oldest are dropped first)
+MAX_STORED_TWEET_IDS = 2000
+
+# Bluesky credentials
+BSKY_HANDLE = os.environ.get("BSKY_HANDLE")
+BSKY_APP_PASSWORD = os.environ.get("BSKY_APP_PASSWORD")
+
+# Bluesky pacing: steady posting rate, and how low the server-reported
+# remaining budget can get before we start spreading posts out
+BSKY_MAX_POSTS_PER_SECOND = 5
+BSKY_RATELIMIT_THRESHOLD = 10
+# Bluesky rate-limits each endpoint separately; only the budget of the
+# call that creates posts should pace posting
+BSKY_TRACKED_NSID = "com.atproto.repo.createRecord"
+
+# Max characters per Bluesky post (Bluesky default is 300)
+MAX_BSKY_CHARS = 300
+
+# Base URL for Nitter-style RSS mirror
+NITTER_RSS_TEMPLATE = "https://nitter.net/{username}/rss"
+
+# Some Nitter instances are picky about User-Agent
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/121.0 Safari/537.36"
+    )
+}
+
+# Shared HTTP session so gist and image requests reuse keep-alive connections
+SESSION = requests.Session()
+SESSION.headers.update(HTTP_HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
+# Shared limiter for all Bluesky post calls
+BSKY_LIMITER = AsyncLimiter(BSKY_MAX_POSTS_PER_SECOND, 1)
+
+# Patterns used on every RSS entry / quoted tweet, compiled once
+IMG_SRC_RE = re.compile(r'<img[^>]+src="([^"]+)"')
+HANDLE_RE = re.compile(r'@([A-Za-z0-9_]+)')
+
+
+# ========== HELPER FUNCTIONS ==========
+
+
+def empty_state() -> Dict:
+    """Fresh state used when nothing can be loaded from the gist."""
+    return {
+        "tweet_ids": OrderedDict(),
+        "feed_cache": {},
+        "last_id_by_user": {},
+        "feed_ids": {},
+        "gist_content": None,
+    }
+
+
+async def load_state_async(session: aiohttp.ClientSession) -> Dict:
+    """
+    Load state from a GitHub Gist over the shared aiohttp session.
+    The gist must contain a file named STATE_FILENAME with JSON like:
+    { "tweet_ids": ["123", "456"], "feed_cache": {"user": {"etag": "..."}} }
+    IDs are kept in posting order as the keys of an OrderedDict; the
+    MAX_STORED_TWEET_IDS cap is applied by cap_tweet_ids, not here.
+    feed_cache holds each feed's ETag/Last-Modified for conditional GETs.
+    last_id_by_user holds the first <guid> each user's feed had last run,
+    and feed_ids the tweet IDs that feed produced.
+    """
+    if not GIST_ID or not GIST_TOKEN:
+        print("WARNING: GIST_ID or GIST_TOKEN not set, using empty in-memory state.")
+        return empty_state()
+
+    url = f"https://api.github.com/gists/{GIST_ID}"
+    headers = {
+        "Authorization": f"token {GIST_TOKEN}",
+        "Accept": "application/vnd.github+json",
+    }
+
+    try:
+        async with session.get(
+            url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            resp.raise_for_status()
+            body = await resp.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"ERROR: Failed to fetch gist state: {e}")
+        # fall back to empty state so script still runs
+        return empty_state()
+
+    data = orjson.loads(body)
+    files = data.get("files", {})
+    file_obj = files.get(STATE_FILENAME)
+
+    if not file_obj or "content" not in file_obj:
+        print(f"WARNING: {STATE_FILENAME} not found in gist, starting fresh.")
+        return empty_state()
+
+    try:
+        content = file_obj["content"]
+        state_json = orjson.loads(content)
+        tweet_ids = OrderedDict.fromkeys(state_json.get("tweet_ids", []))
+        feed_cache = state_json.get("feed_cache", {})
+        last_id_by_user = state_json.get("last_id_by_user", {})
+        feed_ids = state_json.get("feed_ids", {})
+        print(f"Loaded {len(tweet_ids)} previously posted tweet IDs from gist.")
+        return {
+            "tweet_ids": tweet_ids,
+            "feed_cache": feed_cache,
+            "last_id_by_user": last_id_by_user,
+            "feed_ids": feed_ids,
+            "gist_content": content,
+        }
+    except Exception as e:
+        print(f"ERROR: Failed to parse gist content, starting fresh: {e}")
+        return empty_state()
+
+
+def save_state(state: Dict) -> None:
+    """
+    Save state back to GitHub Gist.
+    Writes JSON into STATE_FILENAME in the gist, skipping the PATCH when
+    the content matches what the gist already holds.
+    """
+    if not GIST_ID or not GIST_TOKEN:
+        print("WARNING: GIST_ID or GIST_TOKEN not set, state will not be persisted.")
+        return
+
+    # Must stay in posting order: it is the cap's eviction order on the
+    # next run, so sorting would make the cap drop the wrong IDs
+    tweet_ids = list(state.get("tweet_ids", []))
+    # The Gist API wants file content as a str, hence the one decode()
+    content_str = orjson.dumps(
+        {
+            "tweet_ids": tweet_ids,
+            "feed_cache": state.get("feed_cache", {}),
+            "last_id_by_user": state.get("last_id_by_user", {}),
+            "feed_ids": state.get("feed_ids", {}),
+        },
+        option=orjson.OPT_INDENT_2,
+    ).decode()
+
+    if content_str == state.get("gist_content"):
+        print("State unchanged, skipping gist update.")
+        return
+
+    url = f"https://api.github.com/gists/{GIST_ID}"
+    headers = {
+        "Authorization": f"token {GIST_TOKEN}",
+        "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
+    }
+    payload = {
+        "files": {
+            STATE_FILENAME: {
+                "content": content_str
+            }
+        }
+    }
+
+    try:
+        resp = SESSION.patch(url, headers=headers, data=orjson.dumps(payload), timeout=10)
+        resp.raise_for_status()
+        state["gist_content"] = content_str
+        print(f"Saved {len(tweet_ids)} tweet IDs to gist.")
+    except requests.RequestException as e:
+        print(f"ERROR: Failed to save gist state: {e}")
+
+
+def refresh_tweet_id(tweet_ids: OrderedDict, tweet_id: str) -> None:
+    """
+    Move an ID that is still visible in a feed to the newest end of
+    tweet_ids, so the MAX_STORED_TWEET_IDS cap never evicts an ID we could
+    see (and repost) again.
+    """
+    tweet_ids.move_to_end(tweet_id)
+
+
+def cap_tweet_ids(state: Dict, usernames: List[str]) -> None:
+    """
+    Drop the oldest tweet IDs beyond MAX_STORED_TWEET_IDS, but only once
+    every user has a feed_ids entry. Gists written before the cap hold a
+    sorted (i.e. grouped by account) list, where the oldest end is whole
+    accounts rather than old tweets; until each user's feed has been
+    parsed, and its visible IDs refreshed, the list is kept whole.
+    """
+    if not all(u in state["feed_ids"] for u in usernames):
+        return
+    tweet_ids = state["tweet_ids"]
+    while len(tweet_ids) > MAX_STORED_TWEET_IDS:
+        tweet_ids.popitem(last=False)
+
+
+def looks_like_retweet(title: str) -> bool:
+    """
+    Heuristic to detect retweets from the RSS title.
+    Common patterns: "RT @user:" or starting with "RT ".
+    """
+    # Only the first few chars matter, so lowercase just those
+    # instead of the whole title ("rt @" is covered by "rt ")
+    head = title.lstrip()[:3].lower()
+    if head == "rt ":
+        return True
+    return False
+
+
+def extract_media_urls_from_entry(entry) -> List[str]:
+    """
+    Extract image URLs from the RSS entry HTML.
+    For Nitter, images look like:
+      <img src="https://nitter.net/pic/media%2FGkfTMhmXMAAc85u.jpg" ...>
+    """
+    media_urls: List[str] = []
+
+    # description/summary usually contain the HTML
+    html = getattr(entry, "summary", "") or getattr(entry, "description", "") or ""
+
+    # Simple regex to grab src="...":
+    for match in IMG_SRC_RE.findall(html):
+        media_urls.append(match)
+
+    return media_urls
+
+
+def _element_text(el) -> str:
+    """
+    Text of an lxml element with each text node stripped and joined by
+    a single space (same output as BeautifulSoup's get_text(" ", strip=True)).
+    """
+    return " ".join(t.strip() for t in el.itertext() if t.strip())
+
+
+def parse_entry(entry) -> Dict:
+    """
+    Parse the entry HTML once to extract:
+      - main_text: the tweet author's own text
+      - quote_author: handle of quoted user (if any)
+      - quote_text: text from the quoted tweet (if any)
+      - media_urls: image URLs; for Nitter, images look like
+          <img src="https://nitter.net/pic/media%2FGkfTMhmXMAAc85u.jpg" ...>
+    """
+    title = getattr(entry, "title", "") or ""
+    html = getattr(entry, "summary", "") or getattr(entry, "description", "") or ""
+
+    if not html:
+        # Fallback: just use the title as main text
+        return {
+            "main_text": title,
+            "quote_author": None,
+            "quote_text": None,
+            "media_urls": [],
+        }
+
+    try:
+        # Wrap in a <div> so fragments with a single top-level tag still
+        # put every <p>/<blockquote> below the root for XPath
+        root = lxml.html.fragment_fromstring(html, create_parent="div")
+    except (etree.ParserError, etree.XMLSyntaxError):
+        return {
+            "main_text": title,
+            "quote_author": None,
+            "quote_text": None,
+            "media_urls": [],
+        }
+
+    # str() drops lxml's "smart string" back-reference to the tree
+    media_urls: List[str] = [str(src) for src in root.xpath(".//img/@src")]
+
+    # Find quote block, if present
+    quote_block = root.find(".//blockquote")
+
+    # --- Main text: all <p> tags NOT inside a blockquote ---
+    main_paras: List[str] = []
+    for p in root.xpath(".//p[not(ancestor::blockquote)]"):
+        txt = _element_text(p)
+        if txt:
+            main_paras.append(txt)
+
+    main_text = "\n".join(main_paras).strip()
+    if not main_text:
+        # Fallback to title if we couldn't get anything
+        main_text = title
+
+    # --- Quoted tweet info, if any ---
+    quote_author: str | None = None
+    quote_text: str | None = None
+
+    if quote_block is not None:
+        # Author often in <b>PopPulse (@PoppPulse)</b>
+        b = quote_block.find(".//b")
+        if b is not None:
+            b_text = _element_text(b)
+            m = HANDLE_RE.search(b_text)
+            if m:
+                quote_author = m.group(1)  # without '@'
+            else:
+                quote_author = b_text
+
+        # Text: gather all <p> inside the blockquote
+        quote_paras: List[str] = [
+            _element_text(p) for p in quote_block.xpath(".//p")
+        ]
+        qt = " ".join(quote_paras).strip()
+        if qt:
+            quote_text = qt
+
+    return {
+        "main_text": main_text,
+        "quote_author": quote_author,
+        "quote_text": quote_text,
+        "media_urls": media_urls,
+    }
+
+
+async def fetch_rss_bytes(
+    session: aiohttp.ClientSession, username: str, feed_cache: Dict
+) -> bytes | None:
+    """
+    Fetch the raw RSS XML bytes for a given username via an RSS mirror.
+    Sends If-None-Match/If-Modified-Since from `feed_cache` and records the
+    new validators there on success.
+    Returns None if the request fails or the feed is unchanged (304).
+    """
+    rss_url = NITTER_RSS_TEMPLATE.format(username=username)
+    print(f"Fetching RSS for @{username} from {rss_url}")
+
+    cached = feed_cache.get(username) or {}
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        async with session.get(
+            rss_url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            if resp.status == 304:
+                print(f"  RSS for @{username} not modified since last run.")
+                return None
+            resp.raise_for_status()
+            # Raw bytes: lxml reads the XML encoding declaration itself
+            body = await resp.read()
+            feed_cache[username] = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }
+            return body
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"ERROR: Failed to fetch RSS for @{username}: {e}")
+        return None
+
+
+class RssItem(NamedTuple):
+    """One <item> of an RSS feed, named like feedparser's entry fields."""
+    title: str
+    link: str
+    id: str | None
+    summary: str
+
+
+def fast_parse_rss(xml_bytes: bytes) -> Iterator[RssItem]:
+    """
+    Stream <item> elements out of RSS XML with lxml's iterparse.
+    Each item is cleared once read so memory stays flat, and callers can
+    stop iterating as soon as they have enough items.
+    Malformed XML raises etree.XMLSyntaxError, possibly after some items
+    were already yielded.
+    """
+    for _, elem in etree.iterparse(BytesIO(xml_bytes), events=("end",), tag="item"):
+        yield RssItem(
+            title=elem.findtext("title") or "",
+            link=elem.findtext("link") or "",
+            id=elem.findtext("guid"),
+            summary=elem.findtext("description") or "",
+        )
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def parse_rss(
+    username: str, xml_bytes: bytes, limit: int, media: bool, quotes: bool
+) -> List[Dict]:
+    """
+    Parse up to `limit` tweets for a given username out of its RSS XML.
+    Returns list of dicts with id, content, url, media_urls, quote_* fields.
+    With `quotes`, the entry HTML is parsed for the author's own text and
+    any quoted tweet; otherwise the text is the title (or summary).
+    media_urls is only filled in when `media` is set.
+    Skips retweets. Raises etree.XMLSyntaxError on malformed XML, so a
+    feed that breaks part-way never passes for a shorter one.
+    """
+    print(f"  Parsing RSS feed for @{username}")
+
+    tweets: List[Dict] = []
+    for entry in fast_parse_rss(xml_bytes):
+        title = getattr(entry, "title", "") or ""
+
+        # skip retweets based on title
+        if looks_like_retweet(title):
+            print(f"  Skipping retweet: {title[:60]!r}")
+            continue
+
+        if quotes:
+            parsed = parse_entry(entry)
+            content = parsed["main_text"]
+            quote_author = parsed["quote_author"]
+            quote_text = parsed["quote_text"]
+            media_urls = parsed["media_urls"] if media else []
+        else:
+            # Nitter RSS usually has tweet text in title or summary
+            summary = getattr(entry, "summary", "") or ""
+            content = title or summary
+            quote_author = quote_text = None
+            media_urls = extract_media_urls_from_entry(entry) if media else []
+
+        if not content:
+            # nothing to post, skip
+            continue
+
+        tweet_id = getattr(entry, "id", None) or entry.link
+        url = entry.link
+
+        tweets.append(
+            {
+                "id": str(tweet_id),
+                "content": content,
+                "url": url,
+                "username": username,
+                "media_urls": media_urls,
+                "quote_author": quote_author,
+                "quote_text": quote_text,
+            }
+        )
+
+        if len(tweets) >= limit:
+            break
+
+    print(f"  Using {len(tweets)} tweets for @{username} after filtering.")
+    return tweets
+
+
+def peek_first_guid(xml_bytes: bytes) -> str | None:
+    """
+    Raw text of the first <guid> in the RSS XML, found with plain bytes
+    search so an unchanged feed can be skipped without parsing it.
+    """
+    start = xml_bytes.find(b"<guid")
+    if start == -1:
+        return None
+    start = xml_bytes.find(b">", start) + 1
+    end = xml_bytes.find(b"</guid>", start)
+    if start == 0 or end == -1:
+        return None
+    return xml_bytes[start:end].strip().decode("utf-8", "replace")
+
+
+async def fetch_and_parse(
+    session: aiohttp.ClientSession,
+    username: str,
+    limit: int,
+    feed_cache: Dict,
+    last_id_by_user: Dict,
+    media: bool,
+    quotes: bool,
+) -> List[Dict] | None:
+    """
+    Fetch one user's RSS feed and parse it in the default thread pool,
+    so the XML parse doesn't block the other in-flight requests.
+    Skips the parse when the newest item is the same as last run.
+    Returns None when the feed was not parsed (unchanged, fetch failed or
+    not a valid RSS feed). Validators of an invalid feed are dropped from
+    `feed_cache` so they never get committed.
+    """
+    xml_bytes = await fetch_rss_bytes(session, username, feed_cache)
+    if xml_bytes is None:
+        return None
+
+    first_guid = peek_first_guid(xml_bytes)
+    if first_guid is None:
+        # No <item> at all, e.g. an HTML error page served with a 200
+        print(f"ERROR: RSS for @{username} has no items, ignoring it this run.")
+        feed_cache.pop(username, None)
+        return None
+    if first_guid == last_id_by_user.get(username):
+        print(f"  No new items for @{username} since last run.")
+        return None
+
+    loop = asyncio.get_running_loop()
+    try:
+        tweets = await loop.run_in_executor(
+            None, parse_rss, username, xml_bytes, limit, media, quotes
+        )
+    except etree.XMLSyntaxError as e:
+        print(f"ERROR: Failed to parse RSS XML for @{username}: {e}")
+        feed_cache.pop(username, None)
+        return None
+
+    last_id_by_user[username] = first_guid
+    return tweets
+
+
+async def gather_all(
+    session: aiohttp.ClientSession,
+    usernames: List[str],
+    feed_cache: Dict,
+    last_id_by_user: Dict,
+    media: bool,
+    quotes: bool,
+) -> Dict[str, List[Dict] | None]:
+    """
+    Fetch and parse the RSS feeds for all `usernames` concurrently.
+    Returns a dict of username -> list of tweets, or None for feeds that
+    were not parsed this run.
+    """
+    results = await asyncio.gather(
+        *[
+            fetch_and_parse(
+                session, u, TWEETS_PER_USER, feed_cache, last_id_by_user, media, quotes
+            )
+            for u in usernames
+        ]
+    )
+    return dict(zip(usernames, results))
+
+
+def format_bsky_post(tweet: Dict, prefix: str, quotes: bool) -> str:
+    """
+    Format text for the Bluesky post.
+    `prefix` is the per-user attribution header, built once in main.
+    Includes quote info if present.
+    Truncates to MAX_BSKY_CHARS: with `quotes` the whole block is trimmed,
+    otherwise only the tweet body is cut, keeping `reserved` chars spare.
+    """
+    main = tweet["content"]
+    quote_author = tweet.get("quote_author")
+    quote_text = tweet.get("quote_text")
+
+    if quote_author and quote_text:
+        base_text = f"""{prefix}{main}
+
+——
+Quoted @{quote_author}:
+{quote_text}"""
+    else:
+        base_text = prefix + main
+
+    if len(base_text) <= MAX_BSKY_CHARS:
+        return base_text
+
+    if quotes:
+        # Truncation: simplify to trimming the combined block
+        return base_text[:MAX_BSKY_CHARS].rstrip() + "…"
+
+    reserved = 80  # space for truncation ellipsis if needed
+    truncated_body = main[: MAX_BSKY_CHARS - reserved].rstrip()
+    text = f"{prefix}{truncated_body}…"
+    return text[:MAX_BSKY_CHARS]
+
+
+def _upload_image(client: Client, url: str, alt: str) -> models.AppBskyEmbedImages.Image | None:
+    """
+    Stream a single image into memory and upload it as a blob right away,
+    so each upload starts as soon as its own download finishes.
+    Returns the embed image, or None if the download failed.
+    """
+    buf = BytesIO()
+    try:
+        print(f"    Downloading image: {url}")
+        with SESSION.get(url, stream=True, timeout=15) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            shutil.copyfileobj(r.raw, buf)
+    except Exception as e:
+        print(f"    ERROR downloading image {url}: {e}")
+        return None
+
+    upload = client.upload_blob(buf.getvalue())
+    return models.AppBskyEmbedImages.Image(alt=alt, image=upload.blob)
+
+
+def post_to_bluesky(
+    client: Client, tweet: Dict, text: str, image_alt: str, executor: ThreadPoolExecutor
+) -> None:
+    """
+    Post a single tweet to Bluesky using atproto Client.
+    If media URLs are present, download and upload up to 4 images in
+    parallel on `executor`, then post them as an image embed with
+    `image_alt` as each image's alt text.
+    Otherwise, fall back to a text-only post.
+    """
+    media_urls: List[str] = tweet.get("media_urls") or []
+
+    # No media → just text
+    if not media_urls:
+        client.send_post(text)
+        return
+
+    # Limit to 4 images (Bluesky max); executor.map keeps the original order
+    urls = media_urls[:4]
+    images = [
+        image
+        for image in executor.map(_upload_image, [client] * len(urls), urls, [image_alt] * len(urls))
+        if image is not None
+    ]
+
+    if not images:
+        # If we failed to download any images, fall back to text
+        print("    No images successfully downloaded; posting text-only.")
+        client.send_post(text)
+        return
+
+    # Same record send_images builds, but from blobs we already uploaded
+    client.send_post(text, embed=models.AppBskyEmbedImages.Main(images=images))
+
+
+@dataclass
+class RateLimitState:
+    """
+    Latest RateLimit-* budget Bluesky reported for BSKY_TRACKED_NSID.
+    The client is shared with worker threads (login, image uploads),
+    hence the lock.
+    """
+
+    remaining: int | None = None
+    reset: float | None = None  # epoch seconds when the window resets
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def update(self, headers: Dict[str, str]) -> None:
+        try:
+            remaining = int(headers["ratelimit-remaining"])
+            reset = float(headers["ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        with self.lock:
+            self.remaining = remaining
+            self.reset = reset
+
+    def delay(self) -> float:
+        """
+        Seconds to wait before the next request. Zero until fewer than
+        BSKY_RATELIMIT_THRESHOLD requests are left; then what's left of the
+        budget is spread evenly over the rest of the window (with none
+        left, that means waiting for the reset).
+        """
+        with self.lock:
+            if self.remaining is None or self.reset is None:
+                return 0.0
+            if self.remaining >= BSKY_RATELIMIT_THRESHOLD:
+                return 0.0
+            return max(self.reset - time.time(), 0.0) / max(self.remaining, 1)
+
+
+BSKY_RATE_LIMIT = RateLimitState()
+
+
+class RateLimitTrackingClient(Client):
+    """
+    atproto Client that feeds the RateLimit-* headers of BSKY_TRACKED_NSID
+    responses into BSKY_RATE_LIMIT, including those of failed requests
+    (e.g. 429). Other endpoints (createSession on login, uploadBlob, ...)
+    have their own budgets and are ignored.
+    """
+
+    def _invoke(self, invoke_type, **kwargs):
+        tracked = kwargs.get("url", "").endswith("/" + BSKY_TRACKED_NSID)
+        try:
+            response = super()._invoke(invoke_type, **kwargs)
+        except RequestErrorBase as e:
+            if tracked and e.response is not None:
+                BSKY_RATE_LIMIT.update(e.response.headers)
+            raise
+        if tracked:
+            BSKY_RATE_LIMIT.update(response.headers)
+        return response
+
+
+@retry(
+    wait=wait_random_exponential(multiplier=1, max=60),
+    retry=retry_if_exception_type(RateLimitExceededError),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+async def post_with_rate_limit(
+    client: RateLimitTrackingClient,
+    tweet: Dict,
+    text: str,
+    image_alt: str,
+    executor: ThreadPoolExecutor,
+) -> None:
+    """
+    post_to_bluesky behind BSKY_LIMITER and the server-reported
+    BSKY_RATE_LIMIT budget, retried with jittered exponential backoff
+    when Bluesky answers 429.
+    """
+    delay = BSKY_RATE_LIMIT.delay()
+    if delay:
+        print(f"  Bluesky rate limit low ({BSKY_RATE_LIMIT.remaining} left), waiting {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async with BSKY_LIMITER:
+        post_to_bluesky(client, tweet, text, image_alt, executor)
+
+
+# ========== MAIN LOGIC ==========
+
+
+async def main(usernames: List[str], media: bool, quotes: bool) -> None:
+    if not BSKY_HANDLE or not BSKY_APP_PASSWORD:
+        raise RuntimeError(
+            "Bluesky handle or app password not set. "
+            "Set BSKY_HANDLE and BSKY_APP_PASSWORD env vars or edit the script."
+        )
+
+    client = RateLimitTrackingClient()
+    loop = asyncio.get_running_loop()
+
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=4)
+    async with aiohttp.ClientSession(headers=HTTP_HEADERS, connector=connector) as session:
+        # Gist fetch and Bluesky login run concurrently;
+        # atproto's Client is sync, so login runs in a worker thread
+        state, _ = await asyncio.gather(
+            load_state_async(session),
+            loop.run_in_executor(None, client.login, BSKY_HANDLE, BSKY_APP_PASSWORD),
+        )
+        print(f"Logged into Bluesky as {BSKY_HANDLE}")
+
+        # Persist whatever got posted even if the run dies part-way;
+        # SIGTERM becomes SystemExit so the atexit hook still fires
+        atexit.register(save_state, state)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+        # Fetch all feeds up front in parallel; posting stays sequential below.
+        # New validators land in copies and are only written back to state
+        # once a user's tweets are all posted, so an early save never marks
+        # unposted tweets as seen.
+        feed_cache = dict(state["feed_cache"])
+        last_id_by_user = dict(state["last_id_by_user"])
+        tweets_by_user = await gather_all(
+            session, usernames, feed_cache, last_id_by_user, media, quotes
+        )
+
+    # Ordered dict keys, so membership checks and refreshes are O(1)
+    tweet_ids = state["tweet_ids"]
+
+    print(f"Loaded {len(tweet_ids)} previously posted tweet IDs.")
+
+    new_posts_count = 0
+
+    # One pool for all image downloads this run (4 = Bluesky's image limit)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for username in usernames:
+            print(f"\nProcessing @{username}...")
+            tweets = tweets_by_user[username]
+
+            if tweets is None:
+                # Feed not parsed this run: keep last run's IDs fresh instead
+                for tweet_id in reversed(state["feed_ids"].get(username, [])):
+                    if tweet_id in tweet_ids:
+                        refresh_tweet_id(tweet_ids, tweet_id)
+                # A 200 whose newest item matched last run still brings new
+                # validators, and there is nothing to post; fetch and parse
+                # failures leave last run's (or none) in the copy
+                if username in feed_cache:
+                    state["feed_cache"][username] = feed_cache[username]
+                continue
+            state["feed_ids"][username] = [tweet["id"] for tweet in tweets]
+
+            # Built once per user rather than once per tweet / image
+            attribution_prefix = f"@{username}:\n    \n"
+            image_alt = f"Image from tweet by @{username}"
+
+            failed = False
+            # Process in reverse chronological so oldest of the batch posts first
+            for tweet in reversed(tweets):
+                tweet_id = tweet["id"]
+
+                if tweet_id in tweet_ids:
+                    refresh_tweet_id(tweet_ids, tweet_id)
+                    continue
+
+                text = format_bsky_post(tweet, attribution_prefix, quotes)
+                try:
+                    await post_with_rate_limit(client, tweet, text, image_alt, executor)
+                    print(f"  Posted tweet {tweet_id} from @{username} to Bluesky.")
+                    tweet_ids[tweet_id] = None
+                    new_posts_count += 1
+                    if new_posts_count % SAVE_EVERY_N_POSTS == 0:
+                        save_state(state)
+                except Exception as e:
+                    print(f"  ERROR posting tweet {tweet_id} from @{username}: {e}")
+                    failed = True
+
+            if failed:
+                # Refetch the full feed next run so the failed tweet gets retried
+                state["feed_cache"].pop(username, None)
+                state["last_id_by_user"].pop(username, None)
+            else:
+                if username in feed_cache:
+                    state["feed_cache"][username] = feed_cache[username]
+                if username in last_id_by_user:
+                    state["last_id_by_user"][username] = last_id_by_user[username]
+
+    # Only here, once every user's visible IDs have been refreshed; the
+    # periodic and atexit saves write the list uncapped
+    cap_tweet_ids(state, usernames)
+    save_state(state)
+    atexit.unregister(save_state)
+    print(f"\nDone. Posted {new_posts_count} new tweets this run.")
+
+
+def run(usernames: List[str], media: bool = False, quotes: bool = False) -> None:
+    """
+    Crosspost recent tweets from `usernames` to Bluesky.
+    `media` attaches the tweets' images; `quotes` pulls the author's own
+    text out of the entry HTML and appends any quoted tweet.
+    """
+    asyncio.run(main(usernames, media, quotes))